@@ -4,13 +4,19 @@ Fixed to properly load features based on Charts_dataset.xlsx mapping
 """
 
 import os
+import io
 import pandas as pd
 import numpy as np
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from pandas.tseries.frequencies import to_offset
 import rarfile
 import logging
+import threading
+import hashlib
+import warnings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -70,6 +76,46 @@ def parse_datetime_series(series):
         logger.warning(f"DateTime parsing error: {e}")
         return pd.to_datetime(series, errors='coerce')
 
+FINGERPRINT_BLOCK = 4096  # Bytes hashed at the start and just before the consumed offset
+
+def read_new_lines(file_path, offset=0, columns=None):
+    """Read complete CSV lines past a byte offset, returning (new_offset, columns, df)"""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+
+    # Stop at the last newline so a partly written line is picked up next time
+    complete = data.rfind(b'\n') + 1
+    if complete == 0:
+        return offset, columns, None
+
+    if columns is None:
+        df = pd.read_csv(io.BytesIO(data[:complete]))
+        df.columns = df.columns.str.strip()
+    else:
+        df = pd.read_csv(io.BytesIO(data[:complete]), header=None, names=columns)
+    return offset + complete, list(df.columns), df
+
+def source_fingerprint(file_path, offset):
+    """Hash the first block and the block before `offset` of an already consumed file"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(min(offset, FINGERPRINT_BLOCK)))
+        f.seek(max(0, offset - FINGERPRINT_BLOCK))
+        digest.update(f.read(offset - max(0, offset - FINGERPRINT_BLOCK)))
+    return digest.hexdigest()
+
+def source_state(file_path):
+    """Identity of a source file as (inode, size, mtime)"""
+    stat = os.stat(file_path)
+    return stat.st_ino, stat.st_size, stat.st_mtime
+
+def can_extend_source(cached, file_path, state):
+    """Whether a cache built from file_path up to cached['offset'] can be extended by appending"""
+    inode, size, _ = state
+    return (cached['path'] == file_path and cached['inode'] == inode and size >= cached['size']
+            and source_fingerprint(file_path, cached['offset']) == cached['fingerprint'])
+
 # ------------------------------------------------------------------
 # 4. EXCEL CONFIGURATION LOADING - FIXED
 # ------------------------------------------------------------------
@@ -472,6 +518,9 @@ def get_symbol_ohlc(symbol, timeframe='1D'):
 
         latest = candles.iloc[-1]
 
+        # Volume-at-price over the same window as the candles
+        volume_profile = get_volume_profile(symbol, df.index.min(), df.index.max())
+
         return {
             'index': [str(x) for x in candles.index],
             'open': candles['open'].tolist(),
@@ -480,6 +529,7 @@ def get_symbol_ohlc(symbol, timeframe='1D'):
             'close': candles['close'].tolist(),
             'vwap': candles['vwap'].tolist() if not candles['vwap'].isnull().all() else None,
             'volume': candles['volume'].tolist() if not candles['volume'].isnull().all() else None,
+            'volume_profile': volume_profile,
             'latest': {
                 'open': float(latest['open']),
                 'high': float(latest['high']),
@@ -497,7 +547,546 @@ def get_symbol_ohlc(symbol, timeframe='1D'):
         return None
 
 # ------------------------------------------------------------------
-# 7. API ROUTES - UPDATED FOR DYNAMIC FEATURES
+# 7. VOLUME PROFILE - Precomputed Per-Minute Price Histograms
+# ------------------------------------------------------------------
+PROFILE_TICK_SIZE = 0.01      # Base price bucket width
+PROFILE_VALUE_AREA = 0.70     # Share of volume inside the value area
+PROFILE_DEFAULT_ROWS = 50     # Price rows returned to the chart
+
+# Tick sources in order of preference: (file suffix, time, price, size)
+PROFILE_SOURCES = [
+    ('_trade.csv', 'TradeTime', 'Price', 'Size'),
+    ('_tradebar.csv', 'BarStartTime', 'Vwap', 'Volume'),
+]
+
+# Per-symbol store of (minute, price bucket) -> volume, sorted by minute
+# then bucket, plus the byte offset into the source file it has been built to.
+# Stores are never mutated once cached; updates swap in a new store object.
+volume_profile_cache = {}
+# Sources without usable rows: path -> (inode, size, mtime) when rejected
+volume_profile_rejected = {}
+# One lock per symbol so a cold build does not block other symbols
+volume_profile_locks = {}
+volume_profile_lock = threading.Lock()
+
+def _aggregate_profile_rows(minutes, buckets, volumes):
+    """Sum volume per (minute, bucket) pair, sorted by minute then bucket"""
+    if len(minutes) == 0:
+        return minutes, buckets, volumes
+    order = np.lexsort((buckets, minutes))
+    minutes, buckets, volumes = minutes[order], buckets[order], volumes[order]
+    starts = np.flatnonzero(np.r_[True, (np.diff(minutes) != 0) | (np.diff(buckets) != 0)])
+    return minutes[starts], buckets[starts], np.add.reduceat(volumes, starts)
+
+def _read_profile_ticks(file_path, time_col, price_col, size_col, offset=0, columns=None):
+    """Read complete tick lines past a byte offset and bin them into (minute, bucket, volume)"""
+    offset, columns, df = read_new_lines(file_path, offset, columns)
+    if df is None or not all(col in df.columns for col in [time_col, price_col, size_col]):
+        return offset, columns, None
+
+    times = parse_datetime_series(df[time_col].astype(str).str.strip())
+    prices = pd.to_numeric(df[price_col], errors='coerce')
+    sizes = pd.to_numeric(df[size_col], errors='coerce')
+
+    # Drop unparsed rows and the negative sentinel values used in the dataset
+    valid = (times.notna() & (prices > 0) & (sizes > 0)).values
+    minutes = times.values[valid].astype('datetime64[m]').astype(np.int64)
+    buckets = np.rint(prices.values[valid] / PROFILE_TICK_SIZE).astype(np.int64)
+    volumes = sizes.values[valid].astype(np.float64)
+
+    return offset, columns, _aggregate_profile_rows(minutes, buckets, volumes)
+
+def _append_profile_rows(store, minutes, buckets, volumes):
+    """Merge new binned rows into a store's arrays, re-aggregating only the overlapping tail"""
+    if len(minutes) == 0:
+        return store['minutes'], store['buckets'], store['volumes']
+    cut = np.searchsorted(store['minutes'], minutes.min(), side='left')
+    tail = _aggregate_profile_rows(
+        np.concatenate([store['minutes'][cut:], minutes]),
+        np.concatenate([store['buckets'][cut:], buckets]),
+        np.concatenate([store['volumes'][cut:], volumes])
+    )
+    return (
+        np.concatenate([store['minutes'][:cut], tail[0]]),
+        np.concatenate([store['buckets'][:cut], tail[1]]),
+        np.concatenate([store['volumes'][:cut], tail[2]])
+    )
+
+def get_volume_profile_store(symbol):
+    """Get the per-minute histogram store for a symbol, building or extending it as needed"""
+    folder = os.path.join(BASE_DIR, symbol)
+    if not os.path.exists(folder):
+        return None
+
+    files = os.listdir(folder)
+
+    with volume_profile_lock:
+        symbol_lock = volume_profile_locks.setdefault(symbol, threading.Lock())
+
+    with symbol_lock:
+        store = volume_profile_cache.get(symbol)
+
+        for suffix, time_col, price_col, size_col in PROFILE_SOURCES:
+            matches = [f for f in files if f.lower().endswith(suffix)]
+            if not matches:
+                continue
+
+            file_path = os.path.join(folder, matches[0])
+            try:
+                state = source_state(file_path)
+                if volume_profile_rejected.get(file_path) == state:
+                    continue
+
+                if store and store['path'] == file_path:
+                    if (store['inode'], store['size'], store['mtime']) == state:
+                        return store
+
+                    # Extend only when the consumed prefix is unchanged; rewrites rebuild
+                    if can_extend_source(store, file_path, state):
+                        offset, columns, binned = _read_profile_ticks(
+                            file_path, time_col, price_col, size_col, store['offset'], store['columns']
+                        )
+                        arrays = _append_profile_rows(store, *binned) if binned is not None else (
+                            store['minutes'], store['buckets'], store['volumes'])
+                        store = dict(store, inode=state[0], size=state[1], mtime=state[2],
+                                     offset=offset, fingerprint=source_fingerprint(file_path, offset),
+                                     minutes=arrays[0], buckets=arrays[1], volumes=arrays[2])
+                        volume_profile_cache[symbol] = store
+                        logger.info(f"Extended volume profile for {symbol} to byte {offset}")
+                        return store
+
+                offset, columns, binned = _read_profile_ticks(file_path, time_col, price_col, size_col)
+                if binned is None or len(binned[0]) == 0:
+                    volume_profile_rejected[file_path] = state
+                    continue
+
+                store = {
+                    'source': suffix,
+                    'path': file_path,
+                    'inode': state[0],
+                    'size': state[1],
+                    'mtime': state[2],
+                    'offset': offset,
+                    'fingerprint': source_fingerprint(file_path, offset),
+                    'columns': columns,
+                    'minutes': binned[0],
+                    'buckets': binned[1],
+                    'volumes': binned[2]
+                }
+                volume_profile_cache[symbol] = store
+                logger.info(f"Built volume profile for {symbol} from '{matches[0]}' ({len(binned[0])} minute buckets)")
+                return store
+
+            except Exception as e:
+                logger.warning(f"Error building volume profile from {file_path}: {e}")
+                continue
+
+        return None
+
+def _profile_minute(timestamp):
+    """Minutes since epoch for a naive exchange-local timestamp"""
+    timestamp = pd.Timestamp(timestamp)
+    if pd.isna(timestamp):
+        raise ValueError('Not a timestamp')
+    if timestamp.tzinfo is not None:
+        raise ValueError('Timezone-aware timestamps are not supported; use exchange local time')
+    return np.datetime64(timestamp, 'm').astype(np.int64)
+
+def get_volume_profile(symbol, start=None, end=None, rows=PROFILE_DEFAULT_ROWS):
+    """Get volume-at-price profile (POC, value area, HVN/LVN) for an inclusive time window"""
+    try:
+        store = get_volume_profile_store(symbol)
+        if store is None:
+            return None
+
+        minutes = store['minutes']
+        lo = 0 if start is None else np.searchsorted(minutes, _profile_minute(start), side='left')
+        hi = len(minutes) if end is None else np.searchsorted(minutes, _profile_minute(end), side='right')
+        if hi <= lo:
+            return None
+
+        # Merge the per-minute histograms over the window into one histogram
+        buckets = store['buckets'][lo:hi]
+        base = buckets.min()
+        hist = np.bincount(buckets - base, weights=store['volumes'][lo:hi])
+
+        # Coarsen the base buckets into at most `rows` price rows
+        step = max(1, int(np.ceil(len(hist) / max(int(rows), 1))))
+        hist = np.pad(hist, (0, -len(hist) % step)).reshape(-1, step).sum(axis=1)
+        bucket_size = step * PROFILE_TICK_SIZE
+        prices = (base * PROFILE_TICK_SIZE - PROFILE_TICK_SIZE / 2) + (np.arange(len(hist)) + 0.5) * bucket_size
+
+        total = hist.sum()
+        if total <= 0:
+            return None
+
+        # Value area - expand from the POC towards the heavier neighbour
+        poc = int(np.argmax(hist))
+        va_low, va_high = poc, poc
+        va_volume = hist[poc]
+        while va_volume < PROFILE_VALUE_AREA * total:
+            below = hist[va_low - 1] if va_low > 0 else -1
+            above = hist[va_high + 1] if va_high < len(hist) - 1 else -1
+            if above >= below:
+                va_high += 1
+                va_volume += above
+            else:
+                va_low -= 1
+                va_volume += below
+
+        # High/low volume nodes - local peaks above and troughs below the mean
+        mean = hist.mean()
+        left = np.r_[-np.inf, hist[:-1]]
+        right = np.r_[hist[1:], -np.inf]
+        hvn = np.flatnonzero((hist > left) & (hist >= right) & (hist >= mean))
+        lvn = np.flatnonzero((hist < left) & (hist <= right) & (hist < mean))
+
+        return {
+            'source': store['source'],
+            'bucket_size': round(bucket_size, 6),
+            'prices': np.round(prices, 6).tolist(),
+            'volumes': hist.tolist(),
+            'total_volume': float(total),
+            'poc': round(float(prices[poc]), 6),
+            'value_area_high': round(float(prices[va_high] + bucket_size / 2), 6),
+            'value_area_low': round(float(prices[va_low] - bucket_size / 2), 6),
+            'hvn': np.round(prices[hvn], 6).tolist(),
+            'lvn': np.round(prices[lvn], 6).tolist()
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting volume profile for {symbol}: {e}")
+        return None
+
+# ------------------------------------------------------------------
+# 8. CROSS-SYMBOL CORRELATION - Rolling Correlation/Beta Matrices
+# ------------------------------------------------------------------
+CORRELATION_DEFAULT_WINDOW = 30        # Bars per rolling window
+CORRELATION_MAX_WINDOW = 1000          # Largest window accepted from clients
+CORRELATION_MIN_BARS = 5               # Paired bars needed before a value is reported
+CORRELATION_CACHE_SIZE = 32            # Cached (timeframe, window, benchmark) states
+CORRELATION_HISTORY_SIZE = 64          # Change records kept for incremental catch-up
+CORRELATION_DEFAULT_BENCHMARK = 'SPY'
+COMPOSITE_BENCHMARK = 'EQUAL_WEIGHT'   # Used when the benchmark is not local
+
+# Minute bar sources in order of preference: (file suffix, time, close)
+MINUTE_BAR_SOURCES = [
+    ('_tradebar.csv', 'BarStartTime', 'Close'),
+    ('_tsd.csv', 'CurrentTime', 'CurrentPrice'),
+]
+
+# Each cache level keeps a version and a short list of (version, change) records,
+# where change is the earliest changed minute/row or None for a full rebuild.
+# symbol -> per-minute closes plus the byte offset read so far
+minute_close_cache = {}
+# Sources without usable rows: path -> (inode, size, mtime) when rejected
+minute_close_rejected = {}
+# timeframe -> (bars x symbols) price array aligned on a common time grid
+price_grid_cache = {}
+# (timeframe, window, benchmark) -> rolling window sums, least recently used first
+correlation_cache = OrderedDict()
+correlation_lock = threading.Lock()
+
+def _record_change(state, change):
+    """Bump a cache version and remember where it changed (None for a full rebuild)"""
+    state['version'] += 1
+    state['changes'].append((state['version'], change))
+    del state['changes'][:-CORRELATION_HISTORY_SIZE]
+
+def _changes_since(state, version):
+    """Earliest change recorded after `version`, or None when a full rebuild is needed"""
+    changes = [change for v, change in state['changes'] if v > version]
+    if len(changes) != state['version'] - version or any(change is None for change in changes):
+        return None
+    return min(changes)
+
+def _read_minute_closes(file_path, time_col, close_col, offset=0, columns=None):
+    """Read complete bar lines past a byte offset and resample them to 1-minute closes"""
+    offset, columns, df = read_new_lines(file_path, offset, columns)
+    if df is None or time_col not in df.columns or close_col not in df.columns:
+        return offset, columns, None
+
+    times = parse_datetime_series(df[time_col].astype(str).str.strip())
+    closes = pd.Series(pd.to_numeric(df[close_col], errors='coerce').values, index=times)
+    closes = closes[closes.index.notna() & (closes > 0)].sort_index()
+    return offset, columns, closes.resample('1min').last().dropna()
+
+def get_minute_closes(symbol):
+    """Get per-minute closes for a symbol, reading only lines appended since the last call"""
+    folder = os.path.join(BASE_DIR, symbol)
+    if not os.path.exists(folder):
+        return None
+
+    files = os.listdir(folder)
+    for suffix, time_col, close_col in MINUTE_BAR_SOURCES:
+        matches = [f for f in files if f.lower().endswith(suffix)]
+        if not matches:
+            continue
+
+        file_path = os.path.join(folder, matches[0])
+        try:
+            state = source_state(file_path)
+            if minute_close_rejected.get(file_path) == state:
+                continue
+
+            cached = minute_close_cache.get(symbol)
+            if cached and cached['path'] == file_path:
+                if (cached['inode'], cached['size'], cached['mtime']) == state:
+                    return cached
+
+                # Same file grown by appends - merge only the new minutes
+                if can_extend_source(cached, file_path, state):
+                    offset, _, closes = _read_minute_closes(
+                        file_path, time_col, close_col, cached['offset'], cached['columns']
+                    )
+                    cached.update(inode=state[0], size=state[1], mtime=state[2], offset=offset,
+                                  fingerprint=source_fingerprint(file_path, offset))
+                    if closes is not None and len(closes) > 0:
+                        cached['closes'] = closes.combine_first(cached['closes'])
+                        _record_change(cached, closes.index[0])
+                    return cached
+
+            offset, columns, closes = _read_minute_closes(file_path, time_col, close_col)
+            if closes is None or len(closes) == 0:
+                minute_close_rejected[file_path] = state
+                continue
+
+            rebuilt = {
+                'path': file_path,
+                'inode': state[0],
+                'size': state[1],
+                'mtime': state[2],
+                'offset': offset,
+                'fingerprint': source_fingerprint(file_path, offset),
+                'columns': columns,
+                'closes': closes,
+                'version': cached['version'] if cached else 0,
+                'changes': cached['changes'] if cached else []
+            }
+            _record_change(rebuilt, None)
+            minute_close_cache[symbol] = rebuilt
+            return rebuilt
+
+        except Exception as e:
+            logger.warning(f"Error loading minute bars from {file_path}: {e}")
+            continue
+
+    return None
+
+def _resample_closes(closes, freq, since=None):
+    """Resample minute closes to bar closes, optionally only bars labelled at or after `since`"""
+    if since is None:
+        return closes.resample(freq).last().dropna()
+    # Start one period early so the bar labelled `since` sees all of its minutes
+    bars = closes[closes.index >= since - to_offset(freq)].resample(freq).last().dropna()
+    return bars[bars.index >= since]
+
+def get_price_grid(symbols, timeframe='1m'):
+    """Align closes of all symbols onto a common time grid as a (bars x symbols) array"""
+    freq = TIME_RANGES.get(timeframe, TIME_RANGES['1D'])['resample']
+
+    states = {}
+    for symbol in symbols:
+        state = get_minute_closes(symbol)
+        if state is not None:
+            states[symbol] = state
+
+    if not states:
+        return None
+
+    grid = price_grid_cache.get(timeframe)
+    if grid and grid['symbols'] == list(states):
+        dirty = [_changes_since(state, grid['seen'][symbol])
+                 for symbol, state in states.items() if grid['seen'][symbol] != state['version']]
+        if not dirty:
+            return grid
+
+        if None not in dirty:
+            # Re-derive only the bars from the earliest changed one onwards, and
+            # only for changed symbols; the others keep their cached columns
+            since = pd.Series([0.0], index=[min(dirty)]).resample(freq).last().index[0]
+            keep = int(grid['index'].searchsorted(since, side='left'))
+            tail = pd.DataFrame(grid['prices'][keep:], index=grid['index'][keep:], columns=grid['symbols'])
+            changed = {symbol: _resample_closes(state['closes'], freq, since)
+                       for symbol, state in states.items() if grid['seen'][symbol] != state['version']}
+            index = tail.index
+            for bars in changed.values():
+                index = index.union(bars.index)
+            tail = tail.reindex(index)
+            for symbol, bars in changed.items():
+                tail[symbol] = bars.reindex(tail.index)
+            tail = tail.dropna(how='all')
+            if len(tail) > 0:
+                grid['index'] = grid['index'][:keep].append(tail.index)
+                grid['prices'] = np.vstack([grid['prices'][:keep], tail.values.astype(np.float64)])
+            else:
+                grid['index'] = grid['index'][:keep]
+                grid['prices'] = grid['prices'][:keep]
+            grid['seen'] = {symbol: state['version'] for symbol, state in states.items()}
+            _record_change(grid, keep)
+            return grid
+
+    # Bars where a symbol did not trade stay NaN - no prices are carried forward
+    frame = pd.concat({symbol: _resample_closes(state['closes'], freq)
+                       for symbol, state in states.items()}, axis=1).sort_index()
+    rebuilt = {
+        'symbols': list(frame.columns),
+        'index': frame.index,
+        'prices': frame.values.astype(np.float64),
+        'seen': {symbol: state['version'] for symbol, state in states.items()},
+        'version': grid['version'] if grid else 0,
+        'changes': grid['changes'] if grid else []
+    }
+    _record_change(rebuilt, None)
+    price_grid_cache[timeframe] = rebuilt
+    logger.info(f"Built {timeframe} price grid: {len(frame)} bars x {len(frame.columns)} symbols")
+    return rebuilt
+
+def _window_sums(returns):
+    """Pairwise sums over rows of a returns block, skipping NaNs per pair"""
+    valid = (~np.isnan(returns)).astype(np.float64)
+    x = np.nan_to_num(returns)
+    return [valid.T @ valid, x.T @ valid, (x * x).T @ valid, x.T @ x]
+
+def _combine_sums(sums, returns, sign):
+    """Add (sign=1) or remove (sign=-1) a block of return rows from window sums"""
+    if len(returns) == 0:
+        return
+    for total, part in zip(sums, _window_sums(returns)):
+        total += sign * part
+
+def _benchmark_columns(symbols, benchmark):
+    """Column order with the benchmark last, or None when an equal-weight composite is appended"""
+    if benchmark in symbols:
+        idx = symbols.index(benchmark)
+        order = [i for i in range(len(symbols)) if i != idx] + [idx]
+        return [symbols[i] for i in order], order, benchmark
+    return symbols + [COMPOSITE_BENCHMARK], None, COMPOSITE_BENCHMARK
+
+def _block_returns(prices, order):
+    """Log returns per bar in benchmark column order; NaN where either bar is missing"""
+    returns = np.diff(np.log(prices), axis=0)
+    if order is not None:
+        return returns[:, order]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        composite = np.nanmean(returns, axis=1, keepdims=True)
+    return np.hstack([returns, composite])
+
+def _window_log_returns(prices, order):
+    """Log return from the first to the last valid price of each column in a window"""
+    valid = ~np.isnan(prices)
+    cols = np.arange(prices.shape[1])
+    first = prices[valid.argmax(axis=0), cols]
+    last = prices[len(prices) - 1 - valid[::-1].argmax(axis=0), cols]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_returns = np.where(valid.sum(axis=0) >= 2, np.log(last / first), np.nan)
+    if order is not None:
+        return log_returns[order]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return np.r_[log_returns, np.nanmean(log_returns)]
+
+def _roll_correlation_state(state, grid, window, order):
+    """Roll window sums forward to the current grid, touching only rows that entered, left or changed"""
+    total = len(grid['prices']) - 1
+    new_lo = max(0, total - window)
+    block = _block_returns(grid['prices'][new_lo:], order)
+
+    changed = None if state['version'] is None else _changes_since(grid, state['version'])
+    if changed is not None:
+        # Return row j spans price rows j and j+1
+        first_changed = min(max(0, changed - 1), state['hi'])
+        shared_lo = max(state['lo'], new_lo)
+        if shared_lo < first_changed:
+            old, old_lo = state['block'], state['lo']
+            sums = state['sums']
+            _combine_sums(sums, old[:shared_lo - old_lo], -1)
+            _combine_sums(sums, old[first_changed - old_lo:], -1)
+            _combine_sums(sums, block[:shared_lo - new_lo], 1)
+            _combine_sums(sums, block[first_changed - new_lo:], 1)
+            state.update(lo=new_lo, hi=total, block=block, version=grid['version'])
+            return
+
+    state.update(lo=new_lo, hi=total, block=block, version=grid['version'], sums=_window_sums(block))
+
+def _matrix_to_list(matrix):
+    """Convert a float matrix to nested lists with None in place of NaN/inf"""
+    rounded = np.round(matrix, 6).astype(object)
+    rounded[~np.isfinite(matrix)] = None
+    return rounded.tolist()
+
+def _correlation_result(state, grid, timeframe, window):
+    """Correlation, beta and relative strength from a state's window sums"""
+    n, sx, sxx, sxy = state['sums']
+
+    # cov_ij = (n*sum(xy) - sum(x)*sum(y)) / n^2 over bars where both are valid
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (n * sxy - sx * sx.T) / (n * n)
+        var = (n * sxx - sx * sx) / (n * n)
+        correlation = cov / np.sqrt(var * var.T)
+        beta = cov / var.T
+
+    too_few = n < CORRELATION_MIN_BARS
+    correlation[too_few] = np.nan
+    beta[too_few] = np.nan
+
+    # Relative strength - window price change of each symbol vs the benchmark
+    window_return = _window_log_returns(grid['prices'][state['lo']:], state['order'])
+    relative_strength = np.exp(window_return - window_return[-1])
+
+    return {
+        'timeframe': timeframe,
+        'window': window,
+        'min_bars': CORRELATION_MIN_BARS,
+        'benchmark': state['benchmark'],
+        'as_of': str(grid['index'][-1]),
+        'bars': int(len(grid['index'])),
+        'symbols': state['columns'],
+        'window_bars': np.diag(n).astype(int).tolist(),
+        'correlation': _matrix_to_list(correlation),
+        'beta': _matrix_to_list(beta),
+        'benchmark_correlation': _matrix_to_list(correlation[:, -1]),
+        'benchmark_beta': _matrix_to_list(beta[:, -1]),
+        'relative_strength': _matrix_to_list(relative_strength)
+    }
+
+def get_correlation_matrix(timeframe='1m', window=CORRELATION_DEFAULT_WINDOW,
+                           benchmark=CORRELATION_DEFAULT_BENCHMARK):
+    """Get rolling correlation, beta and relative strength for all local symbols"""
+    try:
+        symbols = get_local_symbols()
+        if not symbols:
+            return None
+
+        with correlation_lock:
+            grid = get_price_grid(symbols, timeframe)
+            if grid is None or len(grid['prices']) < 2:
+                return None
+
+            key = (timeframe, window, benchmark)
+            columns, order, benchmark_name = _benchmark_columns(grid['symbols'], benchmark)
+            state = correlation_cache.get(key)
+            if state is None or state['columns'] != columns:
+                state = {'columns': columns, 'order': order, 'benchmark': benchmark_name,
+                         'version': None, 'lo': 0, 'hi': 0, 'block': None, 'sums': None}
+                correlation_cache[key] = state
+            correlation_cache.move_to_end(key)
+            while len(correlation_cache) > CORRELATION_CACHE_SIZE:
+                correlation_cache.popitem(last=False)
+
+            if state['version'] != grid['version']:
+                _roll_correlation_state(state, grid, window, order)
+                state['result'] = _correlation_result(state, grid, timeframe, window)
+
+            return state['result']
+
+    except Exception as e:
+        logger.error(f"Error getting correlation matrix for {timeframe}/{window}: {e}")
+        return None
+
+# ------------------------------------------------------------------
+# 9. API ROUTES - UPDATED FOR DYNAMIC FEATURES
 # ------------------------------------------------------------------
 @app.route('/')
 def serve():
@@ -622,6 +1211,62 @@ def get_chart_data():
             'symbol_info': None
         }), 500
 
+@app.route('/api/volume-profile')
+def get_volume_profile_route():
+    """Get volume-at-price profile for an arbitrary chart window"""
+    try:
+        symbol = request.args.get('symbol', '')
+        start = request.args.get('start') or None
+        end = request.args.get('end') or None
+        rows = request.args.get('rows', PROFILE_DEFAULT_ROWS, type=int)
+
+        if not symbol:
+            return jsonify({'error': 'No symbol specified', 'volume_profile': None}), 400
+        if rows is None or rows < 1:
+            return jsonify({'error': 'Rows must be at least 1', 'volume_profile': None}), 400
+
+        try:
+            start = pd.Timestamp(start) if start else None
+            end = pd.Timestamp(end) if end else None
+            for timestamp in (start, end):
+                if timestamp is not None:
+                    _profile_minute(timestamp)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': f'Invalid start/end: {e}', 'volume_profile': None}), 400
+
+        profile = get_volume_profile(symbol, start, end, rows)
+        return jsonify({'symbol': symbol, 'volume_profile': profile})
+
+    except Exception as e:
+        logger.error(f"Error getting volume profile: {e}")
+        return jsonify({'error': str(e), 'volume_profile': None}), 500
+
+@app.route('/api/correlation')
+def get_correlation_route():
+    """Get rolling cross-symbol correlation, beta and relative strength"""
+    try:
+        timeframe = request.args.get('timeframe', '1m')
+        window = request.args.get('window', CORRELATION_DEFAULT_WINDOW, type=int)
+        benchmark = request.args.get('benchmark', CORRELATION_DEFAULT_BENCHMARK)
+
+        if timeframe not in TIME_RANGES:
+            return jsonify({'error': f'Unknown timeframe: {timeframe}', 'correlation': None}), 400
+        if window is None or not 2 <= window <= CORRELATION_MAX_WINDOW:
+            return jsonify({
+                'error': f'Window must be between 2 and {CORRELATION_MAX_WINDOW} bars',
+                'correlation': None
+            }), 400
+
+        result = get_correlation_matrix(timeframe, window, benchmark)
+        if result is None:
+            return jsonify({'error': 'Not enough data', 'correlation': None}), 404
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error getting correlation matrix: {e}")
+        return jsonify({'error': str(e), 'correlation': None}), 500
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
@@ -645,7 +1290,7 @@ def health_check():
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
 # ------------------------------------------------------------------
-# 8. INITIALIZE AND START
+# 10. INITIALIZE AND START
 # ------------------------------------------------------------------
 # Load configuration on startup
 features_df, feature_labels, feature_pane_mapping, feature_file_mapping = load_configuration()
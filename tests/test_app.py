@@ -0,0 +1,230 @@
+"""Tests for the volume profile and cross-symbol correlation caches in app.py"""
+
+import os
+
+import numpy as np
+import pytest
+
+import app
+
+TRADE_HEADER = "SymbolId,TradeTime,Index,Size,TotalVolume,Price,ReportingExchange,TradeCondition\n"
+
+
+def trade_line(minute, price, size, second=0):
+    return f"XYZ,20250717 09:{minute:02d}:{second:02d}.000000,0,{size},0,{price},MEMX,0\n"
+
+
+def write(path, text, mode='w'):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+@pytest.fixture
+def base_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'BASE_DIR', str(tmp_path))
+    for cache in (app.volume_profile_cache, app.volume_profile_rejected):
+        cache.clear()
+    (tmp_path / 'XYZ').mkdir()
+    return tmp_path
+
+
+def cold_profile(symbol, **kwargs):
+    app.volume_profile_cache.clear()
+    app.volume_profile_rejected.clear()
+    return app.get_volume_profile(symbol, **kwargs)
+
+
+# ------------------------------------------------------------------
+# Volume profile
+# ------------------------------------------------------------------
+def test_profile_poc_value_area_and_window(base_dir):
+    path = base_dir / 'XYZ' / 'XYZ_Trade.csv'
+    lines = [trade_line(30, 10.00, 100), trade_line(30, 10.01, 500),
+             trade_line(31, 10.02, 300), trade_line(32, 10.03, 50),
+             trade_line(33, 10.00, -21474836)]
+    write(path, TRADE_HEADER + ''.join(lines))
+
+    profile = app.get_volume_profile('XYZ')
+    assert profile['source'] == '_trade.csv'
+    assert profile['volumes'] == [100.0, 500.0, 300.0, 50.0]
+    assert profile['poc'] == pytest.approx(10.01)
+    assert profile['total_volume'] == 950.0
+    # 500 + 300 = 800 >= 70% of 950
+    assert profile['value_area_low'] == pytest.approx(10.005)
+    assert profile['value_area_high'] == pytest.approx(10.025)
+
+    window = app.get_volume_profile('XYZ', '2025-07-17 09:31', '2025-07-17 09:32')
+    assert window['volumes'] == [300.0, 50.0]
+
+
+def test_append_with_partial_line_matches_cold_rebuild(base_dir):
+    path = base_dir / 'XYZ' / 'XYZ_Trade.csv'
+    write(path, TRADE_HEADER + ''.join(trade_line(30 + i % 5, 10 + i % 7 / 100, 10 + i) for i in range(40)))
+    app.get_volume_profile('XYZ')
+
+    tail = trade_line(34, 10.05, 999, second=30)
+    write(path, ''.join(trade_line(35 + i % 3, 10.02, 7) for i in range(10)) + tail[:15], mode='a')
+    partial = app.get_volume_profile('XYZ')
+    assert partial == cold_profile('XYZ')
+
+    write(path, tail[15:], mode='a')
+    assert app.get_volume_profile('XYZ') == cold_profile('XYZ')
+
+
+def test_inplace_rewrite_rebuilds(base_dir):
+    path = base_dir / 'XYZ' / 'XYZ_Trade.csv'
+    write(path, TRADE_HEADER + ''.join(trade_line(30, 10.00, 100) for _ in range(20)))
+    inode = os.stat(path).st_ino
+    app.get_volume_profile('XYZ')
+
+    # Same inode, larger file, corrected sizes in the already consumed prefix
+    write(path, TRADE_HEADER + ''.join(trade_line(30, 10.00, 200) for _ in range(30)))
+    assert os.stat(path).st_ino == inode
+    assert app.get_volume_profile('XYZ')['total_volume'] == 6000.0
+
+
+def test_shrunk_file_rebuilds(base_dir):
+    path = base_dir / 'XYZ' / 'XYZ_Trade.csv'
+    write(path, TRADE_HEADER + ''.join(trade_line(30, 10.00, 100) for _ in range(20)))
+    app.get_volume_profile('XYZ')
+    write(path, TRADE_HEADER + trade_line(30, 10.00, 100))
+    assert app.get_volume_profile('XYZ')['total_volume'] == 100.0
+
+
+def test_rejected_source_is_not_reparsed(base_dir, monkeypatch):
+    write(base_dir / 'XYZ' / 'XYZ_Trade.csv', TRADE_HEADER)
+    write(base_dir / 'XYZ' / 'XYZ_TradeBar.csv',
+          "SymbolId,BarStartTime,Index,Interval,Open,High,Low,Close,Volume,Vwap\n"
+          "XYZ, 20250717 09:30:00.000000,0,1,10,10,10,10,100,10.00\n")
+
+    assert app.get_volume_profile('XYZ')['source'] == '_tradebar.csv'
+
+    calls = []
+    original = app._read_profile_ticks
+    monkeypatch.setattr(app, '_read_profile_ticks', lambda *a, **k: calls.append(a[0]) or original(*a, **k))
+    assert app.get_volume_profile('XYZ')['source'] == '_tradebar.csv'
+    assert calls == []
+
+
+@pytest.mark.parametrize('query', [
+    'start=garbage',
+    'end=NaT',
+    'start=2025-07-17T09:30:00Z',
+    'rows=0',
+])
+def test_volume_profile_route_rejects_bad_params(base_dir, query):
+    write(base_dir / 'XYZ' / 'XYZ_Trade.csv', TRADE_HEADER + trade_line(30, 10.00, 100))
+    response = app.app.test_client().get(f'/api/volume-profile?symbol=XYZ&{query}')
+    assert response.status_code == 400
+
+
+# ------------------------------------------------------------------
+# Cross-symbol correlation
+# ------------------------------------------------------------------
+BAR_HEADER = "SymbolId,BarStartTime,Index,Interval,Open,High,Low,Close,Volume,Vwap\n"
+
+
+def bar_line(symbol, minute, close, second=0):
+    hour, minute = 9 + minute // 60, minute % 60
+    return f"{symbol}, 20250717 {hour:02d}:{minute:02d}:{second:02d}.000000,0,1,{close},{close},{close},{close},100,{close}\n"
+
+
+@pytest.fixture
+def grid_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'BASE_DIR', str(tmp_path))
+    clear_correlation_caches()
+    return tmp_path
+
+
+def clear_correlation_caches():
+    for cache in (app.minute_close_cache, app.minute_close_rejected,
+                  app.price_grid_cache, app.correlation_cache):
+        cache.clear()
+
+
+def write_bars(base, symbol, lines, mode='w'):
+    folder = base / symbol
+    folder.mkdir(exist_ok=True)
+    write(folder / f'{symbol}_TradeBar.csv', (BAR_HEADER if mode == 'w' else '') + ''.join(lines), mode)
+
+
+def as_array(values):
+    return np.array([[np.nan if v is None else v for v in row] if isinstance(row, list)
+                     else (np.nan if row is None else row) for row in values], dtype=float)
+
+
+def assert_same_result(incremental, cold):
+    for key in ('symbols', 'benchmark', 'bars', 'as_of', 'window_bars'):
+        assert incremental[key] == cold[key]
+    for key in ('correlation', 'beta', 'relative_strength'):
+        np.testing.assert_allclose(as_array(incremental[key]), as_array(cold[key]), atol=1e-5, equal_nan=True)
+
+
+def cold_correlation(*args):
+    clear_correlation_caches()
+    return app.get_correlation_matrix(*args)
+
+
+def test_relative_strength_spans_gaps(grid_dir):
+    write_bars(grid_dir, 'AAA', [bar_line('AAA', m, p) for m, p in [(0, 10), (1, 11), (3, 12)]])
+    write_bars(grid_dir, 'BBB', [bar_line('BBB', m, 100 + 2 * m + m % 2) for m in range(4)])
+
+    result = app.get_correlation_matrix('1m', 30, 'BBB')
+    assert result['symbols'] == ['AAA', 'BBB']
+    assert result['relative_strength'][0] == pytest.approx((12 / 10) / (107 / 100), abs=1e-6)
+    # Gapped returns are left out, and too few paired bars report null
+    assert result['window_bars'] == [1, 3]
+    assert result['correlation'][0][1] is None
+
+
+@pytest.mark.parametrize('timeframe,window', [('1m', 20), ('5m', 4)])
+def test_incremental_bars_match_cold_rebuild(grid_dir, timeframe, window):
+    rng = np.random.default_rng(7)
+    symbols = ['AAA', 'BBB', 'CCC']
+    prices = {s: 10 * np.exp(np.cumsum(rng.normal(0, 0.01, 120))) for s in symbols}
+
+    def lines(symbol, minutes):
+        # CCC trades only every third minute
+        return [bar_line(symbol, m, round(prices[symbol][m], 4), second=s)
+                for m in minutes for s in (0, 30) if symbol != 'CCC' or m % 3 == 0]
+
+    for symbol in symbols:
+        write_bars(grid_dir, symbol, lines(symbol, range(60)))
+    app.get_correlation_matrix(timeframe, window)
+
+    for start, stop in [(60, 61), (61, 75), (75, 120)]:
+        for symbol in symbols:
+            text = ''.join(lines(symbol, range(start, stop)))
+            # Leave a partly written line behind for one symbol
+            cut = len(text) - 10 if symbol == 'BBB' and stop != 120 else len(text)
+            write(grid_dir / symbol / f'{symbol}_TradeBar.csv', text[:cut], 'a')
+            lines_left = text[cut:]
+            if lines_left:
+                app.get_correlation_matrix(timeframe, window)
+                write(grid_dir / symbol / f'{symbol}_TradeBar.csv', lines_left, 'a')
+        incremental = app.get_correlation_matrix(timeframe, window)
+        assert app.price_grid_cache[timeframe]['changes'][-1][1] is not None
+        assert_same_result(incremental, cold_correlation(timeframe, window))
+
+
+def test_incremental_update_does_not_rebuild_grid(grid_dir, monkeypatch):
+    for symbol in ['AAA', 'BBB']:
+        write_bars(grid_dir, symbol, [bar_line(symbol, m, 10 + m % 4) for m in range(30)])
+    app.get_correlation_matrix('1m', 10)
+
+    calls = []
+    original = app._window_sums
+    monkeypatch.setattr(app, '_window_sums', lambda block: calls.append(len(block)) or original(block))
+    write_bars(grid_dir, 'AAA', [bar_line('AAA', 30, 12)], mode='a')
+    app.get_correlation_matrix('1m', 10)
+
+    assert app.minute_close_cache['AAA']['changes'][-1][1] is not None
+    assert app.price_grid_cache['1m']['changes'][-1][1] is not None
+    # Only the entering/changed and leaving rows were summed, not the whole window
+    assert sum(calls) < 10
+
+
+def test_correlation_route_bounds_window(grid_dir):
+    client = app.app.test_client()
+    assert client.get('/api/correlation?window=1').status_code == 400
+    assert client.get(f'/api/correlation?window={app.CORRELATION_MAX_WINDOW + 1}').status_code == 400
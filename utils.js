@@ -78,6 +78,18 @@ export class APIClient {
     return this.get(`/chart-data?${params}`)
   }
 
+  async getVolumeProfile(symbol, start, end, rows = 50) {
+    const params = new URLSearchParams({ symbol, rows })
+    if (start) params.append("start", start)
+    if (end) params.append("end", end)
+    return this.get(`/volume-profile?${params}`)
+  }
+
+  async getCorrelation(timeframe = "1m", window = 30, benchmark = "SPY") {
+    const params = new URLSearchParams({ timeframe, window, benchmark })
+    return this.get(`/correlation?${params}`)
+  }
+
   async getHealth() {
     return this.get("/health")
   }